@@ -0,0 +1,55 @@
+# =============================================================
+# GERAÇÃO OFFLINE DA TABELA `isolamentos` (IEEE123)
+# – Reaproveita a varredura das NFs do backend (main.py)
+# – Grava todas as opções vão × NF no banco lido pelo streamlit_app.py
+# – Executar a partir da pasta backend/:  python build_isolamentos.py
+# =============================================================
+import os
+import sqlite3
+
+from main import NFS, NAS, TOPO, NF_ISOL, NF_KW, precompute
+
+DB = os.path.join("..", "ieee123_isolamento.db")
+
+
+def linhas_isolamento():
+    """(linha, nf, nº de barras isoladas, kW) para cada NF que isola cada vão.
+
+    Só linhas físicas: as chaves (NFs/NAs) não são vãos de manutenção.
+    """
+    rows = []
+    for vao, (u, v) in sorted(TOPO.items()):
+        if vao in NFS or vao in NAS:
+            continue
+        for nf in NFS:
+            isol = NF_ISOL[nf]
+            if u in isol and v in isol:
+                rows.append((vao, nf, len(isol), NF_KW[nf]))
+    return rows
+
+
+def gravar(rows, db_path=DB):
+    """Recria a tabela `isolamentos` com o índice usado na consulta por vão."""
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS isolamentos")
+        conn.execute(
+            """
+            CREATE TABLE isolamentos (
+                linha TEXT,
+                nf TEXT,
+                barras_isoladas INTEGER,
+                kw_interrompida REAL
+            )
+            """
+        )
+        conn.executemany("INSERT INTO isolamentos VALUES (?, ?, ?, ?)", rows)
+        conn.execute("CREATE INDEX idx_linha ON isolamentos(linha)")
+    conn.close()
+
+
+if __name__ == "__main__":
+    precompute()
+    rows = linhas_isolamento()
+    gravar(rows)
+    print(f"✅ {len(rows)} opções de isolamento gravadas em {DB}")
@@ -12,12 +12,15 @@ app = FastAPI()
 def root():
     return {"status": "backend ok 🎉"}
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-import os, re, glob
-import py_dss_interface
+import os, re, glob, hashlib, functools, threading
+import numpy as np
+import numba
+from numba import njit, prange
 import opendssdirect as dssod
 
 # ===========================
@@ -26,9 +29,28 @@ import opendssdirect as dssod
 BASE = "./../123Bus/"    # mesma pasta usada no seu GitHub
 RUN = BASE + "Run_IEEE123Bus.DSS"
 MASTER = BASE + "IEEE123Master.dss"
-LOADS = BASE + "IEEE123Loads.dss"
+LOADS = BASE + "IEEE123Loads.DSS"
 
-app = FastAPI()
+NFS = ["sw1","sw2","sw3","sw4","sw5","sw6"]   # normalmente fechadas
+NAS = ["sw7","sw8"]                           # normalmente abertas
+SOURCE_BUS = "150"                            # barra da Vsource (antes do regulador)
+
+# debug: isolamento pelo fluxo de potência do OpenDSS em vez da BFS no grafo
+ISOLAMENTO_POR_FLUXO = os.environ.get("ISOLAMENTO_POR_FLUXO") == "1"
+
+# ===========================
+# CACHE EM MEMÓRIA
+# (preenchido uma única vez no startup; o modelo é estático)
+# ===========================
+TOPO = {}           # {linha (minúsculas): (barra_de, barra_para)}
+NF_ISOL = {}        # {nf: frozenset(barras_isoladas)}
+NF_KW = {}          # {nf: kW interrompido}
+BEST_NF = {}        # {linha: (nf, frozenset(barras_isoladas), kW)} — só vãos isoláveis
+CSR = {}            # grafo do estado nominal em CSR: indptr, indices, edge_nf, src (build_csr)
+CACHE_HEADERS = {}  # ETag / Cache-Control das respostas
+
+# respostas serializadas pelo orjson (encoder em C)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Habilitar acesso do Streamlit
 app.add_middleware(
@@ -43,7 +65,13 @@ app.add_middleware(
 # FUNÇÕES DE SUPORTE
 # ===========================
 def normalize(bus):
-    return bus.split('.')[0] if bus else ""
+    return bus.partition('.')[0] if bus else ""
+
+# uma única regex por definição de carga: barra (sem nós) e kW
+_LOAD_RE = re.compile(
+    r"^[ \t]*new[ \t]+load\.\S+[ \t].*?bus1=([^\s.]+)\S*[ \t].*?kw=([\d.]+)",
+    re.IGNORECASE | re.MULTILINE,
+)
 
 def load_loads():
     """Carrega cargas do arquivo IEEE123Loads.dss"""
@@ -51,77 +79,403 @@ def load_loads():
     if not os.path.exists(LOADS):
         return loads
     with open(LOADS,"r",encoding="utf-8",errors="ignore") as f:
-        for line in f:
-            s=line.strip().lower()
-            if "new load" not in s: 
-                continue
-            m_bus=re.search(r"bus1=([\w\.]+)",s)
-            m_kw=re.search(r"kw=([\d\.]+)",s)
-            if m_bus and m_kw:
-                bus=normalize(m_bus.group(1))
-                kw=float(m_kw.group(1))
-                loads[bus]=loads.get(bus,0)+kw
+        text = f.read()
+    for m in _LOAD_RE.finditer(text):
+        bus = m.group(1).lower()
+        loads[bus] = loads.get(bus,0) + float(m.group(2))
     return loads
 
 
-def barras_por_fluxo(dss, eps_volt=1.0):
-    """Retorna barras isoladas pelo critério de tensão."""
-    isol, energ = [], []
-    try:
-        all_buses = dss.circuit.all_bus_names()
-        def getv(b): dss.circuit.set_active_bus(b); return dss.bus.vmag_angle()
-    except:
-        all_buses = dssod.Circuit.AllBusNames()
-        def getv(b): dssod.Circuit.SetActiveBus(b); return dssod.Bus.VMagAngle()
-
-    for b in all_buses:
-        mags = (getv(b) or [])[0::2]
-        if max(mags) < eps_volt:
-            isol.append(normalize(b))
-        else:
-            energ.append(normalize(b))
-    return isol, energ
-
-
-def open_switch(name):
-    """Abre os dois terminais de uma chave NF."""
-    dssod.Circuit.SetActiveElement(f"Line.{name}")
-    ncond = dssod.CktElement.NumConductors()
-    for t in (1,2):
-        for c in range(1,ncond+1):
-            dssod.CktElement.Open(t,c)
-
-
-def close_switch(name):
-    """Fecha os dois terminais."""
-    dssod.Circuit.SetActiveElement(f"Line.{name}")
-    ncond = dssod.CktElement.NumConductors()
-    for t in (1,2):
-        for c in range(1,ncond+1):
-            dssod.CktElement.Close(t,c)
-
-
-def simulate_nf(nf, loads):
-    """Abre 1 NF e calcula efeito."""
-    # recompilar limpo
-    dssod.Basic.ClearAll()
+# arquivo de cargas é estático: lido uma única vez ao importar o módulo
+BUS_KW = load_loads()   # {barra: kW}
+
+
+_BUS_LAYOUT = {}    # {(circuito, nº de nós): (barras, offsets das barras no vetor de nós)}
+
+def bus_layout():
+    """Agrupamento nós → barras do circuito ativo (calculado uma vez por circuito)."""
+    key = (dssod.Circuit.Name(), dssod.Circuit.NumNodes())
+    if key not in _BUS_LAYOUT:
+        buses = np.asarray([normalize(b) for b in dssod.Circuit.AllBusNames()])
+        first = {}
+        for i, node in enumerate(dssod.Circuit.AllNodeNames()):
+            first.setdefault(normalize(node), i)
+        # barra i ocupa os nós offsets[i]:offsets[i+1]
+        offsets = np.asarray([first[b] for b in buses] + [key[1]], dtype=np.intp)
+        _BUS_LAYOUT[key] = (buses, offsets)
+    return _BUS_LAYOUT[key]
+
+
+_LOAD_VEC = {}      # {(circuito, nº de nós): kW por barra, na ordem de bus_layout()}
+
+def load_vector():
+    """BUS_KW alinhado à ordem das barras do circuito ativo."""
+    key = (dssod.Circuit.Name(), dssod.Circuit.NumNodes())
+    if key not in _LOAD_VEC:
+        buses, _ = bus_layout()
+        _LOAD_VEC[key] = np.asarray([BUS_KW.get(b, 0.0) for b in buses], dtype=np.float64)
+    return _LOAD_VEC[key]
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _isolated_kernel(vmag, offsets, eps):
+    """max(|V|) por barra < eps, numa única passada sobre o vetor de nós."""
+    n = len(offsets) - 1
+    out = np.empty(n, np.uint8)
+    for i in range(n):
+        m = 0.0
+        for k in range(offsets[i], offsets[i+1]):
+            v = vmag[k]
+            if v > m:
+                m = v
+        out[i] = m < eps
+    return out
+
+
+@njit(cache=True)
+def _sum_kw(kw, mask):
+    """Soma de kW das barras marcadas na máscara."""
+    s = 0.0
+    for i in range(kw.size):
+        if mask[i]:
+            s += kw[i]
+    return s
+
+
+@njit(cache=True, boundscheck=False)
+def _bfs_isolated(indptr, indices, edge_nf, src, nf_id):
+    """BFS a partir de src no grafo CSR sem as arestas da NF nf_id: barras não alcançadas."""
+    n = len(indptr) - 1
+    visto = np.zeros(n, np.bool_)
+    fila = np.empty(n, np.int32)    # cada barra entra no máximo uma vez
+    visto[src] = True
+    fila[0] = src
+    ini, fim = 0, 1
+    while ini < fim:
+        b = fila[ini]
+        ini += 1
+        for k in range(indptr[b], indptr[b+1]):
+            viz = indices[k]
+            if edge_nf[k] != nf_id and not visto[viz]:
+                visto[viz] = True
+                fila[fim] = viz
+                fim += 1
+    return ~visto
+
+
+# o kernel paralelo roda fora da thread principal (aquecimento em segundo plano,
+# uvicorn em thread no Colab): com TBB o processo trava ao encerrar, então
+# OpenMP/workqueue têm prioridade
+numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+# workqueue não aceita lançamentos simultâneos de threads diferentes
+_PARALLEL_LOCK = threading.Lock()
+
+
+@njit(cache=True, parallel=True)
+def _eval_all_nfs(indptr, indices, edge_nf, src, nf_ids):
+    """Máscaras de isolamento (uma linha por NF) de todas as NFs de nf_ids."""
+    out = np.empty((len(nf_ids), len(indptr) - 1), np.bool_)
+    # BFS independentes, uma por thread; cada uma aloca a própria fila/visitados
+    for j in prange(len(nf_ids)):
+        out[j] = _bfs_isolated(indptr, indices, edge_nf, src, nf_ids[j])
+    return out
+
+
+def _jit_warmup():
+    """Chama os kernels Numba com entradas mínimas para gerar (ou carregar do cache) o código."""
+    _isolated_kernel(np.zeros(2), np.array([0, 1, 2], dtype=np.intp), 1.0)
+    _sum_kw(np.zeros(2), np.zeros(2, dtype=np.bool_))
+    i32 = lambda *v: np.array(v, dtype=np.int32)
+    with _PARALLEL_LOCK:
+        _eval_all_nfs(i32(0, 1, 2), i32(1, 0), i32(-1, -1), 0, i32(0))
+
+
+# compila os kernels em segundo plano, em paralelo à compilação do modelo DSS no startup
+threading.Thread(target=_jit_warmup, daemon=True).start()
+
+
+def isolated_mask(eps_volt=1.0):
+    """Máscara booleana (na ordem de bus_layout()) das barras sem tensão."""
+    buses, offsets = bus_layout()
+    # uma única chamada traz |V| de todos os nós
+    vmag = np.asarray(dssod.Circuit.AllBusVMag(), dtype=np.float64)
+    return buses, _isolated_kernel(vmag, offsets, eps_volt).view(np.bool_)
+
+
+def switch_cmds(action, name):
+    """Comandos DSS que abrem/fecham ('open'/'close') os dois terminais de uma chave."""
+    # sem "cond=" o OpenDSS atua em todos os condutores do terminal
+    return [f"{action} Line.{name} term={t}" for t in (1,2)]
+
+
+# comandos formatados uma única vez por chave
+_OPEN_CMD = {sw: switch_cmds("open", sw) for sw in NFS + NAS}
+_CLOSE_CMD = {sw: switch_cmds("close", sw) for sw in NFS + NAS}
+
+# estado nominal: NFs fechadas, NAs abertas
+NOMINAL_CMDS = [c for sw in NFS for c in _CLOSE_CMD[sw]] \
+             + [c for na in NAS for c in _OPEN_CMD[na]]
+
+# script completo por NF: restaura o estado nominal, abre a NF e resolve
+# (lista enviada por Text.Commands: Text.Command não separa comandos por "\n")
+_NF_SCRIPT = {nf: NOMINAL_CMDS + _OPEN_CMD[nf] + ["Solve"] for nf in NFS}
+
+
+# o teste de isolamento só precisa de |V| ≈ 0 ou não: um solve único (snap),
+# sem iterações de controle de reguladores/capacitores
+PROBE_CMDS = ["set mode=snap", "set controlmode=off"]
+
+
+def compile_actor():
+    """Compila o modelo no ator ativo e aplica o estado nominal."""
+    # o master começa com "Clear", que limpa apenas o ator ativo
     dssod.Text.Command(f'Compile "{MASTER}"')
+    dssod.Text.Commands(PROBE_CMDS + NOMINAL_CMDS)
 
-    # garantir estado nominal
-    for sw in ["sw1","sw2","sw3","sw4","sw5","sw6"]:
-        close_switch(sw)
-    for na in ["sw7","sw8"]:
-        open_switch(na)
 
-    # abrir NF
-    open_switch(nf)
+def compile_master():
+    """Descarta todos os circuitos/atores e compila o modelo uma única vez."""
+    dssod.Basic.ClearAll()
+    compile_actor()
+
+
+def isolation_result():
+    """Barras isoladas e kW interrompido no circuito do ator ativo (já resolvido)."""
+    buses, isol_mask = isolated_mask()
+    return frozenset(buses[isol_mask].tolist()), _sum_kw(load_vector(), isol_mask)
+
+
+def simulate_nf(nf):
+    """Abre 1 NF e calcula efeito (modelo já compilado por compile_master)."""
+    # restaura o estado nominal e abre a NF, numa única chamada
+    dssod.Text.Commands(_NF_SCRIPT[nf])
+    return isolation_result()
 
-    dssod.Text.Command("Solve")
 
-    isol, _ = barras_por_fluxo(dss)    
-    kW = sum(loads.get(b,0) for b in isol)
+def simulate_nfs_parallel(nfs):
+    """
+    Simula várias NFs ao mesmo tempo: atores do OpenDSS no mesmo processo,
+    no máximo um por CPU. Retorna {nf: (barras_isoladas, kW)}.
+    """
+    compile_master()    # ator 1
+    # o OpenDSS não cria mais atores que CPUs ("There are no more CPUs available")
+    n_atores = min(len(nfs), dssod.Parallel.NumCPUs())
+    if n_atores < 2:
+        return {nf: simulate_nf(nf) for nf in nfs}
+    for _ in range(n_atores - 1):
+        dssod.Parallel.CreateActor()    # o novo ator passa a ser o ativo
+        compile_actor()
+
+    result = {}
+    # NFs em lotes de n_atores; cada ator restaura o estado nominal e abre a sua NF
+    for ini in range(0, len(nfs), n_atores):
+        lote = nfs[ini:ini + n_atores]
+        # com o modo paralelo ligado, Solve retorna logo e roda na thread do ator
+        dssod.Parallel.ActiveParallel(1)
+        try:
+            for actor, nf in enumerate(lote, start=1):
+                dssod.Parallel.ActiveActor(actor)
+                dssod.Text.Commands(_NF_SCRIPT[nf])
+            dssod.Parallel.Wait()
+        finally:
+            dssod.Parallel.ActiveParallel(0)
+
+        for actor, nf in enumerate(lote, start=1):
+            dssod.Parallel.ActiveActor(actor)
+            result[nf] = isolation_result()
+    dssod.Parallel.ActiveActor(1)
+    return result
+
+
+def build_network():
+    """
+    Uma única passada (cursor) pelos elementos PD do modelo compilado:
+    – topo: {linha: (bus1, bus2)} de todas as linhas, inclusive chaves
+    – adj:  grafo barra–barra dos elementos (linhas, trafos, reguladores)
+            em serviço no estado nominal, ou seja, sem as NAs
+    """
+    topo, adj = {}, {}
+    abertos = {f"line.{na}" for na in NAS}
+    i = dssod.PDElements.First()
+    while i > 0:
+        elem = dssod.PDElements.Name().lower()
+        buses = [normalize(b) for b in dssod.CktElement.BusNames()]
+        if elem.startswith("line."):
+            topo[elem[len("line."):]] = (buses[0], buses[1])
+        if elem not in abertos:
+            # trafos de 3+ enrolamentos: liga os enrolamentos em cadeia
+            for b1, b2 in zip(buses, buses[1:]):
+                if b1 != b2:    # ex.: capacitor ligado ao terra da própria barra
+                    adj.setdefault(b1, []).append((b2, elem))
+                    adj.setdefault(b2, []).append((b1, elem))
+        i = dssod.PDElements.Next()
+    return topo, adj
+
+
+def build_csr(adj):
+    """
+    Grafo barra–barra em CSR, com as barras na ordem de bus_layout():
+    – vizinhos da barra i: indices[indptr[i]:indptr[i+1]]
+    – edge_nf[k]: posição em NFS do elemento da aresta k (-1 se não for NF)
+    – src: índice da barra fonte
+    """
+    buses, _ = bus_layout()
+    idx = {b: i for i, b in enumerate(buses.tolist())}
+    nf_id = {f"line.{nf}": k for k, nf in enumerate(NFS)}
+    indptr = np.zeros(len(idx) + 1, dtype=np.int32)
+    indices, edge_nf = [], []
+    for i, b in enumerate(buses.tolist()):
+        for viz, elem in adj.get(b, ()):
+            indices.append(idx[viz])
+            edge_nf.append(nf_id.get(elem, -1))
+        indptr[i+1] = len(indices)
+    return {
+        "indptr": indptr,
+        "indices": np.asarray(indices, dtype=np.int32),
+        "edge_nf": np.asarray(edge_nf, dtype=np.int32),
+        "src": idx[SOURCE_BUS],
+    }
+
 
-    return set(isol), kW
+def isolated_by_opening(nfs):
+    """
+    Abre cada NF (uma por vez) no grafo nominal: barras que a BFS a partir
+    da fonte não alcança. Retorna {nf: (barras_isoladas, kW)}.
+    """
+    nf_ids = np.asarray([NFS.index(nf) for nf in nfs], dtype=np.int32)
+    with _PARALLEL_LOCK:
+        masks = _eval_all_nfs(CSR["indptr"], CSR["indices"], CSR["edge_nf"], CSR["src"], nf_ids)
+    # kW de todas as NFs num único produto matriz × vetor
+    kws = masks @ load_vector()
+    buses, _ = bus_layout()
+    return {nf: (frozenset(buses[masks[j]].tolist()), float(kws[j]))
+            for j, nf in enumerate(nfs)}
+
+
+def isolated_nominal():
+    """Barras já sem alimentação no estado nominal (ex.: stubs atrás das NAs)."""
+    # id que não corresponde a nenhuma aresta: nenhuma NF aberta
+    nenhuma = np.asarray([len(NFS)], dtype=np.int32)
+    with _PARALLEL_LOCK:
+        mask = _eval_all_nfs(CSR["indptr"], CSR["indices"], CSR["edge_nf"], CSR["src"], nenhuma)[0]
+    buses, _ = bus_layout()
+    return frozenset(buses[mask].tolist())
+
+
+def discount_nominal(efeitos):
+    """
+    Tira das barras isoladas de cada NF as que já estavam sem alimentação no
+    estado nominal. O stub atrás de uma NA (ex.: 300_open) só conta quando a
+    barra do outro lado da NA também fica isolada pela NF.
+    """
+    mortas = isolated_nominal()
+    stubs = {}      # {stub: barra do outro lado da NA}
+    for na in NAS:
+        b1, b2 = TOPO[na]
+        if b2 in mortas:
+            stubs[b2] = b1
+        elif b1 in mortas:
+            stubs[b1] = b2
+    result = {}
+    for nf, (isol, kW) in efeitos.items():
+        isol = isol - mortas
+        result[nf] = (isol | {s for s, b in stubs.items() if b in isol}, kW)
+    return result
+
+
+def best_nf_per_vao():
+    """Melhor NF (menor kW, depois menor nº de barras) para cada vão de TOPO."""
+    # NFs em ordem crescente de custo: a primeira que isola o vão é a ótima,
+    # e as demais nem precisam ser testadas
+    ordem = sorted(NFS, key=lambda nf: (NF_KW[nf], len(NF_ISOL[nf]), nf))
+    best = {}
+    for vao, (u, v) in TOPO.items():
+        if vao in NFS or vao in NAS:    # chaves não são vãos de manutenção
+            continue
+        for nf in ordem:
+            if u in NF_ISOL[nf] and v in NF_ISOL[nf]:
+                best[vao] = (nf, NF_ISOL[nf], NF_KW[nf])
+                break
+    return best
+
+
+def not_modified(request):
+    """True se o cliente já possui a versão atual (If-None-Match)."""
+    etag = CACHE_HEADERS.get("ETag")
+    return etag is not None and request.headers.get("if-none-match") == etag
+
+
+# =======================
+# RESPOSTAS MEMOIZADAS
+# (funções puras do modelo estático já pré-calculado)
+# =======================
+
+@functools.lru_cache(maxsize=None)
+def _compute_map():
+    mapa = {}
+    for nf in NFS:
+        mapa[nf] = {
+            "isoladas": sorted(NF_ISOL[nf]),
+            "kw": NF_KW[nf]
+        }
+    return {"nfs":mapa}
+
+
+@functools.lru_cache(maxsize=None)
+def _compute_isolamento(vao):
+    if vao not in BEST_NF:
+        return {"resultado":"nenhuma_nf_isola_vao"}
+
+    u, v = TOPO[vao]
+    nf_best, isol_best, kw_best = BEST_NF[vao]
+
+    return {
+        "vao": vao,
+        "from": u,
+        "to": v,
+        "nf_escolhida": nf_best,
+        "barras_isoladas": sorted(isol_best),
+        "kw_interrompido": kw_best
+    }
+
+
+# =======================
+# STARTUP: PRÉ-CÁLCULO
+# =======================
+
+@app.on_event("startup")
+def precompute():
+    """Simula cada NF uma única vez e guarda topologia + efeitos."""
+    compile_master()
+    topo, adj = build_network()
+    TOPO.update(topo)
+    # grafo em CSR montado uma única vez; a varredura das NFs só percorre os arrays
+    CSR.update(build_csr(adj))
+
+    if ISOLAMENTO_POR_FLUXO:
+        # validação: fluxo de potência completo, NFs em paralelo (atores do OpenDSS)
+        efeitos = simulate_nfs_parallel(NFS)
+    else:
+        # abrir uma NF só desconecta barras: basta conectividade a partir da fonte
+        efeitos = isolated_by_opening(NFS)
+    efeitos = discount_nominal(efeitos)
+
+    for nf, (isol, kW) in efeitos.items():
+        NF_ISOL[nf] = isol
+        NF_KW[nf] = kW
+
+    BEST_NF.update(best_nf_per_vao())
+
+    digest = hashlib.sha1(repr(sorted(
+        (nf, sorted(NF_ISOL[nf]), NF_KW[nf]) for nf in NFS
+    )).encode()).hexdigest()
+    CACHE_HEADERS.update({
+        "ETag": f'"{digest}"',
+        "Cache-Control": "public, max-age=3600",
+    })
+
+    # aquece o cache: a primeira requisição já encontra o mapa pronto
+    _compute_map()
 
 
 # =======================
@@ -134,75 +488,27 @@ def root():
 
 
 @app.get("/mapear_nfs")
-def mapear_nfs():
+def mapear_nfs(request: Request):
     """Retorna efeito individual de cada NF."""
-    loads = load_loads()
-
-    # mapa geral
-    mapa = {}
-    for nf in ["sw1","sw2","sw3","sw4","sw5","sw6"]:
-        isol,kW = simulate_nf(nf,loads)
-        mapa[nf] = {
-            "isoladas": sorted(list(isol)),
-            "kw": float(kW)
-        }
-    return {"nfs":mapa}
+    if not_modified(request):
+        return Response(status_code=304, headers=CACHE_HEADERS)
+    # ORJSONResponse direto: dispensa o jsonable_encoder do FastAPI
+    return ORJSONResponse(_compute_map(), headers=CACHE_HEADERS)
 
 
 @app.get("/isolamento")
-def isolamento(vao: str):
+def isolamento(vao: str, request: Request):
     """
     Recebe o nome do vão (ex.: 'l75')
     e retorna a melhor NF para isolá-lo.
     """
-
-    # 1) Carregar modelo nominal para extrair topologia
-    dssod.Basic.ClearAll()
-    dssod.Text.Command(f'Compile "{MASTER}"')
-
-    # topologia
-    topo = {}
-    for name in dssod.Lines.AllNames():
-        if not name.lower().startswith("l"):  # linha física
-            topo[name] = {}
-        dssod.Lines.Name(name)
-        b1 = normalize(dssod.Lines.Bus1())
-        b2 = normalize(dssod.Lines.Bus2())
-        topo[name] = {"from":b1, "to":b2}
-
-    if vao not in topo:
+    # validado antes do cache para não memoizar nomes inválidos
+    if TOPO.get(vao.lower()) is None:
         return {"erro":f"Vão {vao} não encontrado."}
 
-    u = topo[vao]["from"]
-    v = topo[vao]["to"]
-
-    loads = load_loads()
-
-    # varrer todas as NFs
-    candidatos=[]
-    for nf in ["sw1","sw2","sw3","sw4","sw5","sw6"]:
-        isol, kW = simulate_nf(nf, loads)
-        if u in isol and v in isol:
-            candidatos.append((nf,kW,len(isol)))
-
-    if not candidatos:
-        return {"resultado":"nenhuma_nf_isola_vao"}
-
-    # melhor NF: menor kW, depois menor nº de barras
-    candidatos.sort(key=lambda x:(x[1],x[2]))
-    best = candidatos[0]
-    nf_best = best[0]
-
-    isol_best, kw_best = simulate_nf(nf_best, loads)
-
-    return {
-        "vao": vao,
-        "from": u,
-        "to": v,
-        "nf_escolhida": nf_best,
-        "barras_isoladas": sorted(list(isol_best)),
-        "kw_interrompido": float(kw_best)
-    }
+    if not_modified(request):
+        return Response(status_code=304, headers=CACHE_HEADERS)
+    return ORJSONResponse(_compute_isolamento(vao.lower()), headers=CACHE_HEADERS)
 
 
 # ============================================================
@@ -1,6 +1,5 @@
 import streamlit as st
 import requests
-import plotly.graph_objects as go
 
 # ====================================
 # CONFIGURAÇÃO
@@ -13,6 +12,7 @@ st.write("Selecione um vão e deixe o backend decidir a chave ótima.")
 
 # 👉 Ajuste aqui a URL do SEU backend (NGROK)
 BACKEND_URL = "https://unportrayable-salina-transinsular.ngrok-free.dev/"
+REQUEST_TIMEOUT = 30   # segundos
 
 # ====================================
 # FUNÇÕES AUXILIARES
@@ -27,10 +27,20 @@ def get_lines():
     except:
         return []
 
+@st.cache_data(show_spinner="Consultando o backend...")
 def get_best_switch(bus_u, bus_v):
+    """Chave ótima para o vão (u, v); cada vão é consultado no backend uma única vez.
+
+    Falhas (HTTP, timeout ou corpo com "erro") levantam exceção: o st.cache_data
+    não guarda o resultado e o próximo clique consulta o backend de novo.
+    """
     payload = {"bus_u": bus_u, "bus_v": bus_v}
-    r = requests.post(f"{BACKEND_URL}/best-switch", json=payload)
-    return r.json()
+    r = requests.post(f"{BACKEND_URL}/best-switch", json=payload, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    result = r.json()
+    if "erro" in result:
+        raise RuntimeError(result["erro"])
+    return result
 
 # ====================================
 # SIDEBAR – CONTROLES
@@ -53,9 +63,16 @@ v = selected_obj["bus2"]
 
 st.sidebar.success(f"Vão selecionado: {u} — {v}")
 
+# Gráfico de resultado é só informativo: estático (sem handlers do Plotly.js) por padrão
+grafico_interativo = st.sidebar.checkbox("Gráfico interativo", value=False)
+
 # Botão de simulação
 if st.sidebar.button("▶ Rodar simulação"):
-    result = get_best_switch(u, v)
+    try:
+        result = get_best_switch(u, v)
+    except (requests.RequestException, ValueError, RuntimeError) as e:
+        st.error(f"❌ Falha ao consultar o backend: {e}")
+        st.stop()
 
     st.subheader("🔍 Resultado da Simulação")
 
@@ -70,6 +87,9 @@ if st.sidebar.button("▶ Rodar simulação"):
         isoladas = result["isolated_buses"]
 
         # PLOT SIMPLIFICADO
+        # plotly só é importado quando há resultado a desenhar (execução ociosa não paga o import)
+        import plotly.graph_objects as go
+
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=[0], y=[0],
@@ -85,7 +105,13 @@ if st.sidebar.button("▶ Rodar simulação"):
             height=200
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(
+            fig,
+            use_container_width=True,
+            theme=None,
+            config={"staticPlot": not grafico_interativo,
+                    "displayModeBar": grafico_interativo},
+        )
 
         st.write("### Barras isoladas")
         st.write(isoladas)
@@ -1,12 +1,13 @@
 import os
 import re
 import sqlite3
-from typing import Dict, List, Tuple
+import threading
+from typing import Dict, List, Tuple, Union
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import networkx as nx
 
 # =========================================================
 #                CONFIGURAÇÃO BÁSICA
@@ -42,19 +43,38 @@ DB_CANDIDATES = [
 
 COORDS_FILE = os.path.join(DATA_DIR, "BusCoords.dat")
 
+# Coordenadas em layout SoA: colunas bus / x / y contíguas
+# (float32 basta: BusCoords são coordenadas de desenho, de baixa precisão)
+def coords_dtype(bus_len: int = 1) -> np.dtype:
+    """Campo bus dimensionado pelo maior nome lido (nomes longos não são truncados)."""
+    return np.dtype([("bus", f"U{max(bus_len, 1)}"), ("x", "f4"), ("y", "f4")])
+
+# Traces em WebGL (Scattergl): o navegador desenha a rede sem um nó SVG por ponto
+USE_GL = True
+
+# Arestas em layout SoA: (nomes das linhas, índice da bus1, índice da bus2)
+Edges = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
 
 # =========================================================
 #                   FUNÇÕES DE SUPORTE
 # =========================================================
 def normalize_bus(bus: str) -> str:
-    return bus.split(".")[0] if bus else ""
+    return bus.partition(".")[0] if bus else ""
+
 
+ISOLAMENTOS_COLS = ("linha", "nf", "barras_isoladas", "kw_interrompida")
+ISOLAMENTOS_SELECT = "SELECT linha, nf, barras_isoladas, kw_interrompida FROM isolamentos"
 
+
+@st.cache_resource
 def get_db_connection() -> Tuple[sqlite3.Connection, str]:
-    """Procura o arquivo ieee123_isolamento.db e abre conexão."""
+    """Procura o arquivo ieee123_isolamento.db e abre conexão (uma por processo)."""
     for path in DB_CANDIDATES:
         if os.path.exists(path):
-            conn = sqlite3.connect(path)
+            # conexão compartilhada entre as sessões (threads) do Streamlit:
+            # todo uso passa por db_lock()
+            conn = sqlite3.connect(path, check_same_thread=False)
             conn.row_factory = sqlite3.Row
             return conn, path
     st.error("❌ Arquivo `ieee123_isolamento.db` não encontrado.\n"
@@ -62,30 +82,55 @@ def get_db_connection() -> Tuple[sqlite3.Connection, str]:
     st.stop()
 
 
-def load_isolamentos(conn: sqlite3.Connection) -> pd.DataFrame:
-    """Carrega tabela de isolamentos (linha, nf, barras_isoladas, kw_interrompida)."""
-    # Verifica se tabela existe
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='isolamentos';")
-    row = cur.fetchone()
-    if not row:
-        st.error("❌ Tabela `isolamentos` não encontrada no banco.\n"
-                 "Confirme se o script do Colab criou a tabela com esse nome.")
-        st.stop()
+@st.cache_resource
+def db_lock() -> threading.Lock:
+    """Serializa o uso da conexão compartilhada (sqlite3 não é seguro entre threads)."""
+    return threading.Lock()
+
+
+def rows_to_frame(rows: List[sqlite3.Row]) -> pd.DataFrame:
+    """Monta o DataFrame coluna a coluna, com dtypes explícitos."""
+    cols = list(zip(*rows)) if rows else [()] * len(ISOLAMENTOS_COLS)
+    return pd.DataFrame({
+        "linha": np.asarray(cols[0], dtype=object),
+        "nf": np.asarray(cols[1], dtype=object),
+        "barras_isoladas": np.asarray(cols[2], dtype=np.int32),
+        "kw_interrompida": np.asarray(cols[3], dtype=np.float32),
+    })
+
+
+@st.cache_data(show_spinner=False)
+def load_isolamentos(_conn: sqlite3.Connection, db_path: str, mtime: float = 0.0) -> pd.DataFrame:
+    """Carrega tabela de isolamentos (linha, nf, barras_isoladas, kw_interrompida).
+
+    Recarregada quando o banco é regravado (novo `mtime`).
+    """
+    with db_lock():
+        # Verifica se tabela existe
+        row = _conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='isolamentos';"
+        ).fetchone()
+        if not row:
+            st.error("❌ Tabela `isolamentos` não encontrada no banco.\n"
+                     "Confirme se o script do Colab criou a tabela com esse nome.")
+            st.stop()
+
+        # Índice para a consulta por vão (load_vao); ignorado se o banco for somente leitura
+        try:
+            _conn.execute("CREATE INDEX IF NOT EXISTS idx_linha ON isolamentos(linha)")
+            _conn.commit()
+        except sqlite3.OperationalError:
+            pass
+
+        # Carrega dados
+        try:
+            rows = _conn.execute(ISOLAMENTOS_SELECT).fetchall()
+        except Exception as e:
+            st.error(f"Erro ao ler tabela `isolamentos`: {e}")
+            st.stop()
 
-    # Carrega dados
     try:
-        df = pd.read_sql_query(
-            """
-            SELECT
-                linha,
-                nf,
-                barras_isoladas,
-                kw_interrompida
-            FROM isolamentos
-            """,
-            conn,
-        )
+        df = rows_to_frame(rows)
     except Exception as e:
         st.error(f"Erro ao ler tabela `isolamentos`: {e}")
         st.stop()
@@ -95,14 +140,34 @@ def load_isolamentos(conn: sqlite3.Connection) -> pd.DataFrame:
     return df
 
 
-def load_coordinates(coords_path: str) -> Dict[str, Tuple[float, float]]:
-    """Lê BusCoords.dat → {bus: (x, y)}."""
-    coords: Dict[str, Tuple[float, float]] = {}
+@st.cache_data(show_spinner=False)
+def load_vao(_conn: sqlite3.Connection, db_path: str, linha: str, mtime: float = 0.0) -> pd.DataFrame:
+    """Opções de NF de um único vão, já ordenadas pelo critério de escolha."""
+    with db_lock():
+        rows = _conn.execute(
+            f"{ISOLAMENTOS_SELECT} WHERE linha = ? ORDER BY kw_interrompida, barras_isoladas",
+            (linha,),
+        ).fetchall()
+    return rows_to_frame(rows)
+
+
+def format_vao(df_vao: pd.DataFrame) -> pd.DataFrame:
+    """Tabela de exibição do vão (NF em maiúsculas, colunas renomeadas), na ordem já vinda do SQL."""
+    return pd.DataFrame({
+        "NF": df_vao["nf"].str.upper(),
+        "Barras isoladas": df_vao["barras_isoladas"],
+        "kW interrompida": df_vao["kw_interrompida"],
+    })
+
 
+def load_coordinates(coords_path: str) -> np.ndarray:
+    """Lê BusCoords.dat → array estruturado com campos (bus, x, y)."""
     if not os.path.exists(coords_path):
         st.error(f"❌ Arquivo de coordenadas não encontrado: `{coords_path}`")
-        return coords
+        return np.empty(0, dtype=coords_dtype())
 
+    # Linha a linha: comentário, cabeçalho "new ..." ou linha malformada é só ignorada
+    rows: List[Tuple[str, float, float]] = []
     with open(coords_path, "r", encoding="utf-8", errors="ignore") as f:
         for line in f:
             s = line.strip()
@@ -110,19 +175,29 @@ def load_coordinates(coords_path: str) -> Dict[str, Tuple[float, float]]:
                 continue
             parts = s.split()
             if len(parts) >= 3:
-                bus = parts[0].strip()
                 try:
-                    x = float(parts[1])
-                    y = float(parts[2])
-                    coords[bus] = (x, y)
+                    rows.append((parts[0], float(parts[1]), float(parts[2])))
                 except ValueError:
                     continue
 
-    if not coords:
+    coords = np.array(rows, dtype=coords_dtype(max((len(r[0]) for r in rows), default=1)))
+
+    if not coords.size:
         st.warning("⚠️ Nenhuma coordenada válida encontrada em BusCoords.dat.")
     return coords
 
 
+def index_buses(coords: np.ndarray) -> Dict[str, int]:
+    """Mapa barra → posição da barra no array de coordenadas."""
+    return {str(b): i for i, b in enumerate(coords["bus"])}
+
+
+_LINE_RE = re.compile(
+    r"^\s*new\s+line\.(\S+)\s+.*?bus1=(\S+)\s+.*?bus2=(\S+)",
+    re.IGNORECASE,
+)
+
+
 def parse_lines_from_dss(data_dir: str) -> Dict[str, Tuple[str, str]]:
     """
     Procura arquivos .dss na pasta 123Bus e extrai definições de linhas:
@@ -132,70 +207,75 @@ def parse_lines_from_dss(data_dir: str) -> Dict[str, Tuple[str, str]]:
     """
     line_map: Dict[str, Tuple[str, str]] = {}
 
-    dss_files: List[str] = []
-    for root, _, files in os.walk(data_dir):
-        for f in files:
-            if f.lower().endswith(".dss"):
-                dss_files.append(os.path.join(root, f))
-
-    pattern = re.compile(
-        r"new\s+line\.([\w\d_]+).*?bus1=([\w\d\.]+).*?bus2=([\w\d\.]+)",
-        re.IGNORECASE,
+    # pasta de dados é plana: scandir basta (e evita o custo do os.walk)
+    dss_files: List[str] = sorted(
+        entry.path
+        for entry in os.scandir(data_dir)
+        if entry.is_file() and entry.name.lower().endswith(".dss")
     )
 
     for path in dss_files:
         try:
             with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                txt = f.read()
+                # regex ancorada aplicada linha a linha: sem backtracking no arquivo inteiro
+                for line in f:
+                    m = _LINE_RE.match(line)
+                    if not m:
+                        continue
+                    name = m.group(1).lower()
+                    bus1 = normalize_bus(m.group(2))
+                    bus2 = normalize_bus(m.group(3))
+                    # Se já existe, não sobrescreve (primeira definição ganha)
+                    if name not in line_map:
+                        line_map[name] = (bus1, bus2)
         except Exception:
             continue
 
-        for m in pattern.finditer(txt):
-            name = m.group(1).lower()
-            bus1 = normalize_bus(m.group(2))
-            bus2 = normalize_bus(m.group(3))
-            # Se já existe, não sobrescreve (primeira definição ganha)
-            if name not in line_map:
-                line_map[name] = (bus1, bus2)
-
     if not line_map:
         st.warning("⚠️ Nenhuma linha encontrada nos arquivos .dss. "
                    "O grafo será limitado.")
     return line_map
 
 
-def build_graph(line_map: Dict[str, Tuple[str, str]]) -> nx.Graph:
-    """Cria grafo NetworkX a partir do mapeamento de linhas → (bus1, bus2)."""
-    G = nx.Graph()
+def build_edges(line_map: Dict[str, Tuple[str, str]], bus2idx: Dict[str, int]) -> Edges:
+    """Arestas (linhas com as duas barras georreferenciadas) como arrays paralelos."""
+    names: List[str] = []
+    e1: List[int] = []
+    e2: List[int] = []
     for line_name, (b1, b2) in line_map.items():
-        if not b1 or not b2:
-            continue
-        G.add_edge(b1, b2, element=line_name)
-    return G
+        if b1 in bus2idx and b2 in bus2idx:
+            names.append(line_name)
+            e1.append(bus2idx[b1])
+            e2.append(bus2idx[b2])
+    return (
+        np.asarray(names, dtype=str),
+        np.asarray(e1, dtype=np.int32),
+        np.asarray(e2, dtype=np.int32),
+    )
 
 
 def edge_trace_for_lines(
     line_names: List[str],
-    line_map: Dict[str, Tuple[str, str]],
-    coords: Dict[str, Tuple[float, float]],
+    edges: Edges,
+    coords: np.ndarray,
     color: str,
     width: float,
-) -> go.Scatter:
+    use_gl: bool = USE_GL,
+) -> Union[go.Scatter, go.Scattergl]:
     """Cria um trace de arestas para um conjunto de linhas, usando uma cor/espessura."""
-    xs: List[float] = []
-    ys: List[float] = []
-    for ln in line_names:
-        ln_low = ln.lower()
-        if ln_low not in line_map:
-            continue
-        b1, b2 = line_map[ln_low]
-        if b1 in coords and b2 in coords:
-            x0, y0 = coords[b1]
-            x1, y1 = coords[b2]
-            xs += [x0, x1, None]
-            ys += [y0, y1, None]
-
-    return go.Scatter(
+    names, e1, e2 = edges
+    sel = np.isin(names, [ln.lower() for ln in line_names])
+    e1, e2 = e1[sel], e2[sel]
+
+    # x0, x1, NaN por aresta: o NaN interrompe a linha no Plotly (como None),
+    # mas mantém o array contíguo em float32
+    xs = np.empty(3 * len(e1), dtype=np.float32)
+    ys = np.empty(3 * len(e1), dtype=np.float32)
+    xs[0::3], xs[1::3], xs[2::3] = coords["x"][e1], coords["x"][e2], np.nan
+    ys[0::3], ys[1::3], ys[2::3] = coords["y"][e1], coords["y"][e2], np.nan
+
+    scatter = go.Scattergl if use_gl else go.Scatter
+    return scatter(
         x=xs,
         y=ys,
         mode="lines",
@@ -205,44 +285,29 @@ def edge_trace_for_lines(
     )
 
 
-def node_trace_from_graph(
-    G: nx.Graph,
-    coords: Dict[str, Tuple[float, float]],
+def node_trace_for_buses(
+    node_idx: np.ndarray,
+    coords: np.ndarray,
     vao_buses: List[str],
     nf_buses: List[str],
     source_bus: str = "150r",
-) -> go.Scatter:
+    use_gl: bool = USE_GL,
+) -> Union[go.Scatter, go.Scattergl]:
     """Cria trace de nós com cores diferentes (fonte, vão, NF, demais)."""
-    node_x: List[float] = []
-    node_y: List[float] = []
-    node_text: List[str] = []
-    node_color: List[str] = []
-
-    vao_set = set(vao_buses)
-    nf_set = set(nf_buses)
-
-    for n in G.nodes():
-        if n not in coords:
-            continue
-        x, y = coords[n]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(n)
-
-        if n == source_bus:
-            node_color.append("#ADFF2F")  # verde claro
-        elif n in vao_set:
-            node_color.append("#FFA500")  # laranja (vão em manutenção)
-        elif n in nf_set:
-            node_color.append("#FF4500")  # vermelho NF
-        else:
-            node_color.append("#1f77b4")  # azul padrão
-
-    return go.Scatter(
-        x=node_x,
-        y=node_y,
+    names = coords["bus"][node_idx]
+
+    # atribuídas em ordem inversa de prioridade: fonte > vão > NF > demais
+    node_color = np.full(len(names), "#1f77b4", dtype=object)  # azul padrão
+    node_color[np.isin(names, nf_buses)] = "#FF4500"           # vermelho NF
+    node_color[np.isin(names, vao_buses)] = "#FFA500"          # laranja (vão em manutenção)
+    node_color[names == source_bus] = "#ADFF2F"                # verde claro
+
+    scatter = go.Scattergl if use_gl else go.Scatter
+    return scatter(
+        x=coords["x"][node_idx],
+        y=coords["y"][node_idx],
         mode="markers+text",
-        text=node_text,
+        text=names.tolist(),
         textposition="top center",
         marker=dict(size=8, color=node_color, line=dict(width=0.5, color="#333")),
         hovertemplate="<b>Barra:</b> %{text}<extra></extra>",
@@ -250,226 +315,292 @@ def node_trace_from_graph(
     )
 
 
-# =========================================================
-#                CARREGAMENTO DE DADOS
-# =========================================================
-st.sidebar.subheader("📂 Dados carregados")
+# Verificação de mtime limitada a uma vez a cada MTIME_TTL segundos (e não a cada rerun):
+# edições nos dados aparecem com no máximo esse atraso
+MTIME_TTL = 10
 
-conn, db_path = get_db_connection()
-st.sidebar.markdown(f"**Banco:** `{os.path.basename(db_path)}`")
 
-df_iso = load_isolamentos(conn)
-coords = load_coordinates(COORDS_FILE)
-line_map = parse_lines_from_dss(DATA_DIR)
-G = build_graph(line_map)
+@st.cache_data(ttl=MTIME_TTL, show_spinner=False)
+def data_mtime(data_dir: str) -> float:
+    """Modificação mais recente entre os arquivos da pasta de dados."""
+    return max((e.stat().st_mtime for e in os.scandir(data_dir) if e.is_file()), default=0.0)
 
-st.sidebar.markdown(f"- Linhas no banco: **{df_iso['linha'].nunique()}**")
-st.sidebar.markdown(f"- Registros de isolamento: **{len(df_iso)}**")
-st.sidebar.markdown(f"- Barras com coordenadas: **{len(coords)}**")
-st.sidebar.markdown(f"- Linhas identificadas nos .dss: **{len(line_map)}**")
 
+@st.cache_data(ttl=MTIME_TTL, show_spinner=False)
+def file_mtime(path: str) -> float:
+    """Modificação do arquivo (ex.: banco SQLite)."""
+    return os.path.getmtime(path)
 
-# =========================================================
-#          SELEÇÃO DO VÃO / LINHA DE MANUTENÇÃO
-# =========================================================
-st.markdown("---")
-st.subheader("🔧 Seleção do Vão para Desligamento")
 
-linhas_disponiveis = sorted(df_iso["linha"].unique())
+@st.cache_resource(show_spinner=False)
+def bootstrap(mtime: float) -> Tuple[np.ndarray, Dict[str, Tuple[str, str]], Edges, np.ndarray]:
+    """Coordenadas, linhas, arestas e nós plotáveis — montados uma vez por versão dos dados."""
+    coords = load_coordinates(COORDS_FILE)
+    line_map = parse_lines_from_dss(DATA_DIR)
+    edges = build_edges(line_map, index_buses(coords))
+    node_idx = np.unique(np.concatenate([edges[1], edges[2]]))
+    return coords, line_map, edges, node_idx
 
-col_sel1, col_sel2 = st.columns([2, 1])
 
-with col_sel1:
-    linha_escolhida = st.selectbox(
-        "Escolha o vão (linha) para manutenção:",
-        options=linhas_disponiveis,
-        index=0 if linhas_disponiveis else None,
-    )
+@st.cache_data(show_spinner=False)
+def base_figure_dict(mtime: float) -> dict:
+    """Figura base (todas as linhas em cinza + layout fixo), montada uma vez por versão dos dados."""
+    coords, line_map, edges, _ = bootstrap(mtime)
 
-with col_sel2:
-    st.info(
-        "O banco contém **todas as opções** de desligamento por NF para cada vão. "
-        "Aqui o app apenas consulta e destaca a opção que isola o vão com **menor carga interrompida** "
-        "(e, em empate, menor número de barras isoladas)."
+    fig = go.Figure()
+    fig.add_trace(edge_trace_for_lines(
+        list(line_map.keys()), edges, coords, color="#B0B0B0", width=1.0
+    ))
+    fig.update_layout(
+        height=650,
+        showlegend=False,
+        margin=dict(l=10, r=10, t=40, b=10),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        # constante: ao trocar de vão o Plotly só atualiza os traces e mantém zoom/pan
+        uirevision="topologia",
     )
+    return fig.to_dict()
 
-if not linha_escolhida:
-    st.stop()
 
-# Filtra registros desse vão
-df_vao = df_iso[df_iso["linha"] == linha_escolhida].copy()
+# Um mapa por vão (~118 no IEEE-123); o limite só segura o cache se os dados mudarem muito
+RESULT_FIGURE_MAX = 256
 
-if df_vao.empty:
-    st.error(f"Nenhum registro de isolamento encontrado para a linha **{linha_escolhida}**.")
-    st.stop()
-
-# Ordena candidatos por critério
-df_vao.sort_values(["kw_interrompida", "barras_isoladas"], inplace=True)
-
-nf_melhor = df_vao.iloc[0]["nf"]
-kw_melhor = df_vao.iloc[0]["kw_interrompida"]
-barras_melhor = df_vao.iloc[0]["barras_isoladas"]
-
-col_info1, col_info2 = st.columns([2, 2])
-
-with col_info1:
-    st.markdown(f"### 📌 Vão selecionado: **{linha_escolhida}**")
-    st.markdown(f"### 🧭 NF de manobra ótima: **{nf_melhor.upper()}**")
-
-with col_info2:
-    st.metric("⚡ Carga interrompida (kW)", f"{kw_melhor:.1f}")
-    st.metric("🔻 Barras isoladas", int(barras_melhor))
-
-st.markdown("#### 📋 Todas as opções de NF para este vão")
-df_vao_view = df_vao.copy()
-df_vao_view["nf"] = df_vao_view["nf"].str.upper()
-df_vao_view.rename(
-    columns={
-        "nf": "NF",
-        "barras_isoladas": "Barras isoladas",
-        "kw_interrompida": "kW interrompida",
-    },
-    inplace=True,
-)
-st.dataframe(df_vao_view[["NF", "Barras isoladas", "kW interrompida"]], use_container_width=True)
 
+@st.cache_data(max_entries=RESULT_FIGURE_MAX, show_spinner=False)
+def result_figure_dict(mtime: float, linha: str, nf: str) -> dict:
+    """Mapa com o vão e a NF em destaque, montado uma vez por (versão dos dados, vão, NF).
 
-# =========================================================
-#           MAPA COLORIDO COM DESTAQUE DA NF
-# =========================================================
-st.markdown("---")
-st.subheader("🗺️ Mapa da Rede com Destaque do Vão e da NF de Manobra")
-
-# Descobre buses do vão (pelo nome da linha nos .dss)
-vao_buses: List[str] = []
-linha_low = linha_escolhida.lower()
-if linha_low in line_map:
-    vao_buses = list(line_map[linha_low])
-else:
-    st.warning(
-        f"⚠️ Linha **{linha_escolhida}** não encontrada nos arquivos .dss. "
-        "O vão não será destacado no grafo."
-    )
-
-# Descobre buses da NF de manobra (também via .dss)
-nf_buses: List[str] = []
-nf_low = str(nf_melhor).lower()
-if nf_low in line_map:
-    nf_buses = list(line_map[nf_low])
-else:
-    st.warning(
-        f"⚠️ NF **{nf_melhor}** não encontrada nos arquivos .dss. "
-        "Ela será destacada apenas na timeline textual."
-    )
-
-# Se não houver coords, não plota grafo
-if not coords or not G.nodes:
-    st.error("Não foi possível construir o grafo da rede (faltam coordenadas ou linhas).")
-else:
-    # Linhas normais (todas as linhas de distribuição)
-    todas_linhas = list(line_map.keys())
+    Guardado como dict (cópia por sessão), como a figura base: nenhuma sessão
+    altera um go.Figure compartilhado.
+    """
+    coords, line_map, edges, node_idx = bootstrap(mtime)
+    linha_low, nf_low = linha.lower(), nf.lower()
 
     # Separar listas para os highlights
-    linhas_nf = [nf_low] if nf_low in line_map else []
     linhas_vao = [linha_low] if linha_low in line_map else []
+    linhas_nf = [nf_low] if nf_low in line_map else []
+    vao_buses = list(line_map.get(linha_low, ()))
+    nf_buses = list(line_map.get(nf_low, ()))
 
-    # Base: todas as linhas em cinza claro
-    base_lines = edge_trace_for_lines(
-        todas_linhas, line_map, coords, color="#B0B0B0", width=1.0
-    )
+    # Base (todas as linhas em cinza claro) vem do cache; só os destaques são montados aqui
+    fig = go.Figure(base_figure_dict(mtime))
 
     # Destaque do vão (laranja)
-    vao_lines = edge_trace_for_lines(
-        linhas_vao, line_map, coords, color="#FFA500", width=3.0
-    )
+    fig.add_trace(edge_trace_for_lines(
+        linhas_vao, edges, coords, color="#FFA500", width=3.0
+    ))
 
     # Destaque da NF (vermelho)
-    nf_lines = edge_trace_for_lines(
-        linhas_nf, line_map, coords, color="#FF4500", width=3.0
-    )
+    fig.add_trace(edge_trace_for_lines(
+        linhas_nf, edges, coords, color="#FF4500", width=3.0
+    ))
 
     # Nós coloridos
-    nodes_trace = node_trace_from_graph(
-        G,
+    fig.add_trace(node_trace_for_buses(
+        node_idx,
         coords,
         vao_buses=vao_buses,
         nf_buses=nf_buses,
         source_bus="150r",  # fonte pós-regulador, como no seu script do Colab
-    )
-
-    fig = go.Figure()
-    fig.add_trace(base_lines)
-    fig.add_trace(vao_lines)
-    fig.add_trace(nf_lines)
-    fig.add_trace(nodes_trace)
+    ))
 
     fig.update_layout(
-        height=650,
-        showlegend=False,
-        margin=dict(l=10, r=10, t=40, b=10),
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        title=f"Rede IEEE-123 – Vão {linha_escolhida} e NF {nf_melhor.upper()} em destaque",
+        title=f"Rede IEEE-123 – Vão {linha} e NF {nf.upper()} em destaque",
     )
+    return fig.to_dict()
+
+
+# =========================================================
+#                CARREGAMENTO DE DADOS
+# =========================================================
+st.sidebar.subheader("📂 Dados carregados")
+
+conn, db_path = get_db_connection()
+st.sidebar.markdown(f"**Banco:** `{os.path.basename(db_path)}`")
 
-    st.plotly_chart(fig, use_container_width=True)
+db_mtime = file_mtime(db_path)
+df_iso = load_isolamentos(conn, db_path, db_mtime)
+data_version = data_mtime(DATA_DIR)
+coords, line_map, edges, node_idx = bootstrap(data_version)
+
+st.sidebar.markdown(f"- Linhas no banco: **{df_iso['linha'].nunique()}**")
+st.sidebar.markdown(f"- Registros de isolamento: **{len(df_iso)}**")
+st.sidebar.markdown(f"- Barras com coordenadas: **{len(coords)}**")
+st.sidebar.markdown(f"- Linhas identificadas nos .dss: **{len(line_map)}**")
 
 
 # =========================================================
-#                “TIMELINE” DA MANOBRA
+#      ANÁLISE DO VÃO (FRAGMENTO: RERUN SÓ DESTE BLOCO)
 # =========================================================
-st.markdown("---")
-st.subheader("📜 Timeline da Manobra de Desligamento")
+@st.fragment
+def render_analise() -> None:
+    """Seleção do vão, tabela, mapa e timeline.
 
-vao_desc = f"{linha_escolhida}"
-if vao_buses:
-    vao_desc += f" (entre barras {vao_buses[0]} e {vao_buses[1]})"
+    Interações com os widgets daqui reexecutam só este fragmento, sem recarregar
+    banco, coordenadas e barra lateral.
+    """
+    # =========================================================
+    #          SELEÇÃO DO VÃO / LINHA DE MANUTENÇÃO
+    # =========================================================
+    st.markdown("---")
+    st.subheader("🔧 Seleção do Vão para Desligamento")
 
-nf_desc = nf_melhor.upper()
-if nf_buses:
-    nf_desc += f" (entre barras {nf_buses[0]} e {nf_buses[1]})"
+    linhas_disponiveis = sorted(df_iso["linha"].unique())
 
-st.markdown(
-    f"""
-**Passo 1 – Condição inicial**
+    col_sel1, col_sel2 = st.columns([2, 1])
 
-- Todas as chaves **NF (SW1…SW6)** fechadas  
-- Chaves **NA (SW7 / SW8)** abertas  
-- Rede radial alimentada pela barra **150r** (pós-regulador)
+    with col_sel1:
+        linha_escolhida = st.selectbox(
+            "Escolha o vão (linha) para manutenção:",
+            options=linhas_disponiveis,
+            index=0 if linhas_disponiveis else None,
+        )
 
----
+    with col_sel2:
+        st.info(
+            "O banco contém **todas as opções** de desligamento por NF para cada vão. "
+            "Aqui o app apenas consulta e destaca a opção que isola o vão com **menor carga interrompida** "
+            "(e, em empate, menor número de barras isoladas)."
+        )
 
-**Passo 2 – Seleção do vão de manutenção**
+    if not linha_escolhida:
+        return
+
+    # Registros desse vão (filtro e ordenação feitos no SQLite), guardados na sessão:
+    # reruns sem troca de vão (ou de banco) reutilizam o mesmo DataFrame e sua tabela formatada
+    vao_key = (linha_escolhida, db_mtime)
+    if st.session_state.get("vao_key") != vao_key:
+        st.session_state.vao_df = load_vao(conn, db_path, linha_escolhida, db_mtime)
+        st.session_state.vao_view = format_vao(st.session_state.vao_df)
+        # melhor opção (1ª linha) extraída uma vez por vão: (nf, kW, nº de barras)
+        st.session_state.vao_best = next(st.session_state.vao_df[
+            ["nf", "kw_interrompida", "barras_isoladas"]
+        ].itertuples(index=False, name=None), None)
+        st.session_state.vao_key = vao_key
+    df_vao = st.session_state.vao_df
+
+    if df_vao.empty:
+        st.error(f"Nenhum registro de isolamento encontrado para a linha **{linha_escolhida}**.")
+        return
+
+    nf_melhor, kw_melhor, barras_melhor = st.session_state.vao_best
+
+    col_info1, col_info2 = st.columns([2, 2])
+
+    with col_info1:
+        st.markdown(f"### 📌 Vão selecionado: **{linha_escolhida}**")
+        st.markdown(f"### 🧭 NF de manobra ótima: **{nf_melhor.upper()}**")
+
+    with col_info2:
+        st.metric("⚡ Carga interrompida (kW)", f"{kw_melhor:.1f}")
+        st.metric("🔻 Barras isoladas", int(barras_melhor))
+
+    st.markdown("#### 📋 Todas as opções de NF para este vão")
+    df_vao_view = st.session_state.vao_view
+    # poucas linhas por vão: tabela estática (HTML) por padrão; grade interativa só sob demanda
+    if st.checkbox("Tabela interativa", value=False):
+        st.dataframe(df_vao_view, use_container_width=True)
+    else:
+        # arredondado só na tabela estática; a grade interativa mantém a precisão do banco
+        st.table(df_vao_view.round({"kW interrompida": 1}))
+
+
+    # =========================================================
+    #           MAPA COLORIDO COM DESTAQUE DA NF
+    # =========================================================
+    st.markdown("---")
+    st.subheader("🗺️ Mapa da Rede com Destaque do Vão e da NF de Manobra")
+
+    # Descobre buses do vão (pelo nome da linha nos .dss)
+    vao_buses: List[str] = []
+    linha_low = linha_escolhida.lower()
+    if linha_low in line_map:
+        vao_buses = list(line_map[linha_low])
+    else:
+        st.warning(
+            f"⚠️ Linha **{linha_escolhida}** não encontrada nos arquivos .dss. "
+            "O vão não será destacado no grafo."
+        )
 
-- Vão escolhido: **{vao_desc}**  
-- O banco é consultado para recuperar **todas as NFs** que, quando abertas, desenergizam as duas barras do vão  
-- Para cada NF, foram armazenados no banco:
-  - 🔻 Número de barras isoladas  
-  - ⚡ Potência total interrompida (kW)
+    # Descobre buses da NF de manobra (também via .dss)
+    nf_buses: List[str] = []
+    nf_low = str(nf_melhor).lower()
+    if nf_low in line_map:
+        nf_buses = list(line_map[nf_low])
+    else:
+        st.warning(
+            f"⚠️ NF **{nf_melhor}** não encontrada nos arquivos .dss. "
+            "Ela será destacada apenas na timeline textual."
+        )
 
----
+    # Se não houver coords, não plota grafo
+    if not coords.size or not node_idx.size:
+        st.error("Não foi possível construir o grafo da rede (faltam coordenadas ou linhas).")
+    else:
+        # Figura completa do par (vão, NF) vem do cache (dict): reruns sem troca de vão não a remontam
+        fig = result_figure_dict(data_version, linha_escolhida, str(nf_melhor))
+        st.plotly_chart(fig, use_container_width=True, key="mapa_rede")
 
-**Passo 3 – Escolha da NF de manobra ótima**
 
-- Critério adotado:
-  1. **Menor potência interrompida (kW)**  
-  2. Em empate, **menor número de barras isoladas**
+    # =========================================================
+    #                “TIMELINE” DA MANOBRA
+    # =========================================================
+    st.markdown("---")
+    st.subheader("📜 Timeline da Manobra de Desligamento")
 
-- Para o vão **{linha_escolhida}**, a chave ótima é:  
-  👉 **{nf_desc}**  
-  - ⚡ Carga interrompida: **{kw_melhor:.1f} kW**  
-  - 🔻 Barras isoladas: **{int(barras_melhor)}**
+    vao_desc = f"{linha_escolhida}"
+    if vao_buses:
+        vao_desc += f" (entre barras {vao_buses[0]} e {vao_buses[1]})"
 
----
+    nf_desc = nf_melhor.upper()
+    if nf_buses:
+        nf_desc += f" (entre barras {nf_buses[0]} e {nf_buses[1]})"
 
-**Passo 4 – Execução operacional (campo)**
+    st.markdown(
+        f"""
+    **Passo 1 – Condição inicial**
 
-1. Confirmar permissões, autorizações e condições de segurança (tags, bloqueios, etc.)  
-2. Executar a abertura da chave **{nf_melhor.upper()}** conforme procedimento da concessionária  
-3. Verificar ausência de tensão no vão **{linha_escolhida}** e nas barras associadas  
-4. Liberar o trecho para manutenção
+    - Todas as chaves **NF (SW1…SW6)** fechadas  
+    - Chaves **NA (SW7 / SW8)** abertas  
+    - Rede radial alimentada pela barra **150r** (pós-regulador)
 
-> ℹ️ Toda a lógica de cálculo (OpenDSS + Python) foi executada **offline** e consolidada neste banco.  
-> Este app apenas consulta o banco e apresenta, de forma visual, a melhor opção de manobra para cada vão.
-"""
-)
+    ---
+
+    **Passo 2 – Seleção do vão de manutenção**
+
+    - Vão escolhido: **{vao_desc}**  
+    - O banco é consultado para recuperar **todas as NFs** que, quando abertas, desenergizam as duas barras do vão  
+    - Para cada NF, foram armazenados no banco:
+      - 🔻 Número de barras isoladas  
+      - ⚡ Potência total interrompida (kW)
+
+    ---
+
+    **Passo 3 – Escolha da NF de manobra ótima**
+
+    - Critério adotado:
+      1. **Menor potência interrompida (kW)**  
+      2. Em empate, **menor número de barras isoladas**
+
+    - Para o vão **{linha_escolhida}**, a chave ótima é:  
+      👉 **{nf_desc}**  
+      - ⚡ Carga interrompida: **{kw_melhor:.1f} kW**  
+      - 🔻 Barras isoladas: **{int(barras_melhor)}**
+
+    ---
+
+    **Passo 4 – Execução operacional (campo)**
+
+    1. Confirmar permissões, autorizações e condições de segurança (tags, bloqueios, etc.)  
+    2. Executar a abertura da chave **{nf_melhor.upper()}** conforme procedimento da concessionária  
+    3. Verificar ausência de tensão no vão **{linha_escolhida}** e nas barras associadas  
+    4. Liberar o trecho para manutenção
+
+    > ℹ️ Toda a lógica de cálculo (OpenDSS + Python) foi executada **offline** e consolidada neste banco.  
+    > Este app apenas consulta o banco e apresenta, de forma visual, a melhor opção de manobra para cada vão.
+    """
+    )
+
+
+render_analise()